@@ -0,0 +1,116 @@
+import numpy as np
+
+from SimulatedAnnealing import SimulatedAnnealing
+from TSP import TSP
+
+# Centrality measures that depend on the whole graph, they can't be updated only for the affected nodes
+# Column of the centrality dataframe -> measure of get_centrality_data
+GLOBAL_CENTRALITIES = {'pagerank': 'page_rank', 'closeness': 'closeness'}
+
+
+class IncrementalSolver:
+    """
+    A class to keep a route up to date while the distances of the graph change (for example live traffic).
+    A delta of edges is applied to the TSP (and optionally to Neo4j), and the search continues from the previous
+    best tour at a low temperature instead of solving from scratch.
+    """
+
+    def __init__(self, tsp: TSP, graph_creator=None):
+        """
+        :param tsp: the problem to keep up to date
+        :param graph_creator: a GraphCreator to write the deltas to the database, by default only the TSP is updated
+        """
+        self.tsp = tsp
+        self.simulated_annealing = SimulatedAnnealing(tsp)
+        self.graph_creator = graph_creator
+        self.best_solution, self.best_distance = None, float('inf')
+
+    def solve(self, x: int, minimum_temperature: float, initial_temperature: float, cooling_factor: float, n: int,
+              multipl: float = 2, candidates: int = 1):
+        """
+        Solve from scratch with best_of_x and keep the best tour, see parameters on find_solution method
+        """
+        self.best_solution, self.best_distance = self.simulated_annealing.best_of_x(
+            x, minimum_temperature, initial_temperature, cooling_factor, n, multipl=multipl, candidates=candidates)
+        return self.best_solution, self.best_distance
+
+    def apply_delta(self, inserted=(), deleted=(), changed=()):
+        """
+        Apply a delta of edges to the TSP and the database. Only weight changes are cheap everywhere: the
+        centralities don't use distances. Inserted and deleted edges update the local centralities of the affected
+        nodes, and with a database the global ones are read again from the new projection.
+
+        :param inserted: list of dicts with start, end and distance of new edges
+        :param deleted: list of dicts with start and end of the edges to remove
+        :param changed: list of dicts with start, end and the new distance of existing edges
+        :return: the names of the nodes whose neighbors changed
+        """
+        affected = self.tsp.update_graph(inserted, deleted, changed)
+        if self.graph_creator is not None:
+            self.graph_creator.apply_delta(inserted, deleted, changed)
+            if affected:
+                from utils.Centrality import get_centrality_data
+
+                measures = [query for column, query in GLOBAL_CENTRALITIES.items()
+                            if column in self.tsp.get_available_metrics()]
+                if measures:
+                    self.tsp.update_centralities(get_centrality_data(measures))
+
+        if self.best_solution is not None:
+            # The previous best tour is measured again with the new distances
+            self.best_distance = 1 / (self.tsp.get_cost(self.best_solution) + 0.00000001)
+        return affected
+
+    def get_warm_start(self):
+        """
+        Repair the best tour around the edges that are no longer in the graph, keeping the valid segments. Two nodes
+        that are not connected anymore are joined through their closest common neighbor, and when they don't have
+        one the second node is dropped and the tour continues from the first. The tour is scored as a cycle, so the
+        edge from the last node back to the first is repaired the same way, dropping last nodes if needed.
+        :return: a tour whose edges, including the one that closes the cycle, are in the current graph
+        """
+        tour = [self.best_solution[0]]
+        for node in self.best_solution[1:]:
+            if self.tsp.validate_state([tour[-1], node]):
+                tour.append(node)
+            elif (neighbor := self.get_common_neighbor(tour[-1], node)) is not None:
+                tour += [neighbor, node]
+
+        while len(tour) > 1 and not self.tsp.validate_state([tour[-1], tour[0]]):
+            if (neighbor := self.get_common_neighbor(tour[-1], tour[0])) is not None:
+                tour.append(neighbor)
+            else:
+                tour.pop()
+        return tour
+
+    def get_common_neighbor(self, first, second):
+        """
+        :return: the name of the common neighbor of two nodes with the shortest path between them, None if they
+        don't have any
+        """
+        graph, index = self.tsp.graph, self.tsp.node_index
+        first, second = index[first], index[second]
+        common = np.intersect1d(graph.neighbors(first), graph.neighbors(second))
+        if not len(common):
+            return None
+        distances = graph.edge_weights(np.full(len(common), first), common) + \
+            graph.edge_weights(common, np.full(len(common), second))
+        return graph.names[common[np.argmin(distances)]]
+
+    def reoptimize(self, temperature: float, minimum_temperature: float, cooling_factor: float, n: int,
+                   multipl: float = 2, candidates: int = 1):
+        """
+        Continue the search from the best tour at a low temperature, after applying a delta.
+        :param temperature: the initial temperature of the warm start, usually much lower than the one used by solve
+        Other parameters explained on find_solution
+        :return: (tour, distance)
+        """
+        if self.best_solution is None:
+            raise ValueError('There is no tour to start from, call solve first')
+
+        solution, distance = self.simulated_annealing.find_solution(
+            minimum_temperature, temperature, cooling_factor, n, multipl=multipl, candidates=candidates,
+            initial_state=self.get_warm_start())
+        if distance < self.best_distance or not self.tsp.is_solution(self.best_solution):
+            self.best_solution, self.best_distance = solution, distance
+        return self.best_solution, self.best_distance
@@ -0,0 +1,124 @@
+import multiprocessing as mp
+import os
+import queue
+import random
+
+import numpy as np
+import pandas as pd
+
+from SimulatedAnnealing import SimulatedAnnealing
+from TSP import TSP
+from utils.CSRGraph import CSRGraph
+from utils.SharedGraph import attach_graph, release_graph, share_graph
+
+
+def _run_island(spec, start_node, centrality_df, memory_size, seed, epochs, migration_interval, parameters,
+                inbox, outbox, results):
+    """
+    Worker of the island model: runs its own simulated annealing chain on the shared graph, and every
+    migration_interval epochs sends its best tour to the next island and adopts any better tour received.
+    """
+    random.seed(seed)
+    np.random.seed(seed % 2 ** 32)
+    graph, blocks = attach_graph(spec)
+    simulated_annealing = SimulatedAnnealing(TSP(graph, start_node, centrality_df, memory_size=memory_size))
+
+    best_solution, best_distance = None, float('inf')
+    for epoch in range(1, epochs + 1):
+        # Continue from the best tour known by the island, that might come from another island
+        solution, distance = simulated_annealing.find_solution(initial_state=best_solution, **parameters)
+        if distance < best_distance:
+            best_solution, best_distance = solution, distance
+
+        if epoch % migration_interval == 0:
+            outbox.put((best_solution, best_distance))
+            while True:
+                try:
+                    immigrant, immigrant_distance = inbox.get_nowait()
+                except queue.Empty:
+                    break
+                if immigrant_distance < best_distance:
+                    best_solution, best_distance = immigrant, immigrant_distance
+
+    results.put((best_solution, best_distance))
+    # Tours left in the channel are not needed, don't wait for them to be read before exiting
+    inbox.cancel_join_thread()
+    outbox.cancel_join_thread()
+
+
+class IslandModel:
+    """
+    A class to run several simulated annealing chains in parallel (islands) that share their best tours.
+    """
+
+    def __init__(self, graph_data, start_node, centrality_df: pd.DataFrame, memory_size=2):
+        """
+        :param graph_data: A list of dicts containing the graph, as returned by get_data, or a CSRGraph
+        :param start_node: A node to start the route
+        :param centrality_df: a dataframe containing the nodes and some centrality measures
+        :param memory_size: memory size of the TSP used by every island
+        """
+        self.graph = graph_data if isinstance(graph_data, CSRGraph) else CSRGraph.from_edges(graph_data)
+        self.start_node = start_node
+        self.centrality_df = centrality_df
+        self.memory_size = memory_size
+
+    def solve(self, epochs: int, minimum_temperature: float, initial_temperature: float, cooling_factor: float,
+              n: int, multipl: float = 2, candidates: int = 1, islands: int = None, migration_interval: int = 1,
+              seed: int = None):
+        """
+        Run the islands and return the best tour found by any of them. The distance array is placed in shared
+        memory once and every worker reads it from there. The islands form a ring, each one sends its best tour
+        to the next one through a queue.
+        :param epochs: The number of find_solution runs of every island
+        :param islands: The number of worker processes, by default one per core
+        :param migration_interval: The number of epochs between migrations
+        :param seed: Seed for the random generators of the islands, each island uses seed + island
+        Other parameters explained on SimulatedAnnealing.find_solution
+        :return: (tour, distance)
+        """
+        islands = islands or os.cpu_count() or 1
+        seed = random.randrange(2 ** 32) if seed is None else seed
+        parameters = dict(minimum_temperature=minimum_temperature, initial_temperature=initial_temperature,
+                          cooling_factor=cooling_factor, n=n, multipl=multipl, candidates=candidates)
+
+        ctx = mp.get_context()
+        channels = [ctx.Queue() for _ in range(islands)]
+        results = ctx.Queue()
+        spec, blocks = share_graph(self.graph)
+        workers = []
+        try:
+            for island in range(islands):
+                worker = ctx.Process(target=_run_island, daemon=True,
+                                     args=(spec, self.start_node, self.centrality_df, self.memory_size,
+                                           seed + island, epochs, migration_interval, parameters,
+                                           channels[island], channels[(island + 1) % islands], results))
+                worker.start()
+                workers.append(worker)
+
+            best_solution, best_distance = [], float('inf')
+            for _ in range(islands):
+                solution, distance = self._get_result(results, workers)
+                if distance < best_distance:
+                    best_solution, best_distance = solution, distance
+            for worker in workers:
+                worker.join()
+        finally:
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+            release_graph(blocks)
+
+        return best_solution, best_distance
+
+    @staticmethod
+    def _get_result(results, workers):
+        """
+        Wait for the next result, failing if a worker died without sending it.
+        """
+        while True:
+            try:
+                return results.get(timeout=1)
+            except queue.Empty:
+                if any(worker.exitcode not in (None, 0) for worker in workers):
+                    raise RuntimeError('An island stopped before returning its result')
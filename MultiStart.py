@@ -0,0 +1,92 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from SimulatedAnnealing import SimulatedAnnealing
+from TSP import TSP
+from utils.CSRGraph import CSRGraph
+from utils.SharedGraph import attach_graph, share_graph, release_graph
+
+# TSP of the current pool worker, created once by _init_worker
+_worker_problem = None
+_worker_blocks = None
+
+
+def _init_worker(spec, centrality_df, memory_size):
+    global _worker_problem, _worker_blocks
+    graph, _worker_blocks = attach_graph(spec)
+    _worker_problem = TSP(graph, graph.names[0], centrality_df, memory_size=memory_size)
+
+
+def _solve_in_worker(request, parameters):
+    return solve_request(_worker_problem, request, parameters)
+
+
+def solve_request(problem: TSP, request, parameters):
+    """
+    Solve a single request reusing the precomputed data of problem.
+
+    :param problem: a TSP over the whole graph
+    :param request: a start node, or a dict with a start_node and the list of nodes of a sub instance
+    :param parameters: the parameters of SimulatedAnnealing.best_of_x
+    :return: (tour, distance)
+    """
+    if isinstance(request, dict):
+        start_node, nodes = request['start_node'], request.get('nodes')
+    else:
+        start_node, nodes = request, None
+
+    if nodes is None:
+        tsp = problem.with_start_node(start_node)
+    else:
+        tsp = TSP(problem.graph.subgraph(nodes), start_node, problem.centrality_df, memory_size=problem.memory_size)
+    return SimulatedAnnealing(tsp).best_of_x(**parameters)
+
+
+class MultiStart:
+    """
+    A class to solve many routes over the same graph, one per start node (or sub instance), sharing the graph,
+    the node indices and the centrality data between all of them.
+    """
+
+    def __init__(self, graph_data, centrality_df: pd.DataFrame, memory_size=2):
+        """
+        :param graph_data: A list of dicts containing the graph, as returned by get_data, or a CSRGraph
+        :param centrality_df: a dataframe containing the nodes and some centrality measures
+        :param memory_size: memory size of the TSP of every request
+        """
+        self.graph = graph_data if isinstance(graph_data, CSRGraph) else CSRGraph.from_edges(graph_data)
+        self.centrality_df = centrality_df
+        self.memory_size = memory_size
+        self.problem = TSP(self.graph, self.graph.names[0], centrality_df, memory_size=memory_size)
+
+    def solve(self, requests, x: int, minimum_temperature: float, initial_temperature: float,
+              cooling_factor: float, n: int, multipl: float = 2, candidates: int = 1, processes: int = None):
+        """
+        Solve every request with best_of_x, yielding the results as they finish.
+        With processes set, the requests run in a process pool, the graph is placed once in shared memory and every
+        worker prepares its TSP once for all the requests it solves.
+        :param requests: a list of start nodes, or dicts with a start_node and the list of nodes of a sub instance
+        :param processes: The number of worker processes, by default the requests are solved in this process
+        Other parameters explained on SimulatedAnnealing.find_solution
+        :return: a generator of (request, (tour, distance))
+        """
+        parameters = dict(x=x, minimum_temperature=minimum_temperature, initial_temperature=initial_temperature,
+                          cooling_factor=cooling_factor, n=n, multipl=multipl, candidates=candidates)
+
+        if not processes:
+            for request in requests:
+                yield request, solve_request(self.problem, request, parameters)
+            return
+
+        spec, blocks = share_graph(self.graph)
+        executor = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                       initargs=(spec, self.centrality_df, self.memory_size))
+        try:
+            futures = {executor.submit(_solve_in_worker, request, parameters): request for request in requests}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # If the caller stops early, the pending requests are not solved
+            executor.shutdown(cancel_futures=True)
+            release_graph(blocks)
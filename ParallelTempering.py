@@ -0,0 +1,192 @@
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from TSP import TSP
+from utils.CSRGraph import CSRGraph
+from utils.SharedGraph import attach_graph, share_graph, release_graph
+
+# TSP of the current pool worker, created once by _init_worker
+_worker_problem = None
+_worker_blocks = None
+
+
+def _distance(fitness):
+    """
+    Turn the fitness returned by get_cost into a distance, the same way as find_solution.
+    """
+    return 1 / (fitness + 0.00000001)  # to avoid zero division error
+
+
+@contextmanager
+def _seeded(seed):
+    """
+    Seed the global random generators used by TSP, and restore their previous state at the end, so running in
+    this process does not change the random state of the caller.
+    """
+    random_state, numpy_state = random.getstate(), np.random.get_state()
+    random.seed(seed)
+    np.random.seed(seed % 2 ** 32)
+    try:
+        yield
+    finally:
+        random.setstate(random_state)
+        np.random.set_state(numpy_state)
+
+
+def _init_worker(spec, start_node, centrality_df, memory_size):
+    global _worker_problem, _worker_blocks
+    graph, _worker_blocks = attach_graph(spec)
+    _worker_problem = TSP(graph, start_node, centrality_df, memory_size=memory_size)
+
+
+def _run_replica_in_worker(*args):
+    *args, seed = args
+    with _seeded(seed):
+        return run_replica(_worker_problem, *args)
+
+
+def run_replica(problem: TSP, state, memory, temperature, steps, restart_threshold):
+    """
+    Run steps iterations of the Metropolis algorithm at a fixed temperature. As in find_solution the search
+    maximizes the fitness returned by get_cost, so the temperature is on the scale of the fitness (1 / distance).
+
+    :param problem: the TSP, its current state and memory are replaced by the ones of the replica
+    :param state: the current tour of the replica
+    :param memory: the memory of the replica
+    :param temperature: the temperature of the replica
+    :param steps: the number of iterations
+    :param restart_threshold: the maximum length of the tour before restarting it
+    :return: the final state, memory and fitness of the replica, and the best solution found with its distance
+    """
+    problem.update_current_state(state)
+    problem.memory = set(memory)
+
+    current_cost = problem.get_cost(state)
+    best_solution, best_score = None, 0
+    if problem.is_solution(state):
+        best_solution, best_score = state, current_cost
+
+    for _ in range(steps):
+        # The batched proposal avoids the pandas path of get_random_future_state
+        future_state = problem.get_random_future_states(1)[0]
+        problem.select_future_state(future_state)
+        future_cost = problem.get_cost(future_state)
+        energy_change = future_cost - current_cost
+
+        if energy_change >= 0 or random.uniform(0, 1) < math.exp(energy_change / temperature):
+            problem.update_current_state(future_state)
+            current_cost = future_cost
+
+        if len(problem.get_current_state()) > restart_threshold:
+            problem.update_current_state(problem.start())
+            current_cost = problem.get_cost(problem.get_current_state())
+
+        if current_cost > best_score and problem.is_solution(problem.get_current_state()):
+            best_solution, best_score = problem.get_current_state(), current_cost
+
+    best_distance = _distance(best_score) if best_solution is not None else float('inf')
+    return problem.get_current_state(), problem.memory, current_cost, best_solution, best_distance
+
+
+class ParallelTempering:
+    """
+    A class to represent the parallel tempering (replica exchange) algorithm. Several replicas of the search run at
+    fixed temperatures, and neighboring replicas exchange their states with the Metropolis criterion, so there is
+    no cooling schedule to tune.
+    """
+
+    def __init__(self, graph_data, start_node, centrality_df: pd.DataFrame, memory_size=2):
+        """
+        :param graph_data: A list of dicts containing the graph, as returned by get_data, or a CSRGraph
+        :param start_node: A node to start the route
+        :param centrality_df: a dataframe containing the nodes and some centrality measures
+        :param memory_size: memory size of the TSP used by every replica
+        """
+        self.graph = graph_data if isinstance(graph_data, CSRGraph) else CSRGraph.from_edges(graph_data)
+        self.start_node = start_node
+        self.centrality_df = centrality_df
+        self.memory_size = memory_size
+        self.problem = TSP(self.graph, start_node, centrality_df, memory_size=memory_size)
+
+    @staticmethod
+    def get_temperatures(replicas, minimum_temperature, maximum_temperature):
+        """
+        :return: a geometric ladder of temperatures from the minimum to the maximum
+        """
+        return np.geomspace(minimum_temperature, maximum_temperature, replicas).tolist()
+
+    @staticmethod
+    def exchange(round_number, temperatures, states, memories, costs, rng):
+        """
+        Exchange the states of neighboring replicas in place, alternating even and odd pairs between rounds.
+        The energy is minus the fitness, so the hotter replica moves down when it has a better state.
+        :param rng: the random.Random of the solve
+        """
+        for i in range(round_number % 2, len(temperatures) - 1, 2):
+            delta = (1 / temperatures[i] - 1 / temperatures[i + 1]) * (costs[i + 1] - costs[i])
+            if delta >= 0 or rng.uniform(0, 1) < math.exp(delta):
+                states[i], states[i + 1] = states[i + 1], states[i]
+                memories[i], memories[i + 1] = memories[i + 1], memories[i]
+                costs[i], costs[i + 1] = costs[i + 1], costs[i]
+
+    def solve(self, rounds: int, steps: int, replicas: int = 4, minimum_temperature: float = 0.0001,
+              maximum_temperature: float = 0.01, temperatures=None, multipl: float = 2, processes: int = None,
+              seed: int = None):
+        """
+        Run the replicas and return the best solution found by any of them.
+        :param rounds: The number of exchange rounds
+        :param steps: The number of iterations of every replica between exchanges
+        :param replicas: The number of replicas, used when temperatures is not given
+        :param minimum_temperature: Temperature of the coldest replica, used when temperatures is not given
+        :param maximum_temperature: Temperature of the hottest replica, used when temperatures is not given
+        :param temperatures: The temperature of every replica, sorted from cold to hot. The temperatures are
+        compared with differences of fitness (1 / distance), hence the small default values.
+        :param multipl: The multiplier is used to calculate the restart threshold
+        :param processes: The number of worker processes, by default the replicas run in this process
+        :param seed: Seed for the random generators
+        :return: (tour, distance)
+        """
+        temperatures = temperatures or self.get_temperatures(replicas, minimum_temperature, maximum_temperature)
+        rng = random.Random(seed)
+        restart_threshold = multipl * len(self.problem.get_nodes())
+
+        with _seeded(rng.randrange(2 ** 32)):
+            states = [self.problem.start() for _ in temperatures]
+        memories = [set() for _ in temperatures]
+        costs = [self.problem.get_cost(state) for state in states]
+        best_solution, best_distance = [], float('inf')
+
+        executor, blocks = None, []
+        if processes:
+            spec, blocks = share_graph(self.graph)
+            executor = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                           initargs=(spec, self.start_node, self.centrality_df, self.memory_size))
+        try:
+            for round_number in range(rounds):
+                tasks = [(state, memory, temperature, steps, restart_threshold, rng.randrange(2 ** 32))
+                         for state, memory, temperature in zip(states, memories, temperatures)]
+                if executor:
+                    replica_results = list(executor.map(_run_replica_in_worker, *zip(*tasks)))
+                else:
+                    replica_results = []
+                    for *task, replica_seed in tasks:
+                        with _seeded(replica_seed):
+                            replica_results.append(run_replica(self.problem, *task))
+
+                for i, (state, memory, cost, solution, solution_distance) in enumerate(replica_results):
+                    states[i], memories[i], costs[i] = state, memory, cost
+                    if solution_distance < best_distance:
+                        best_solution, best_distance = solution, solution_distance
+
+                self.exchange(round_number, temperatures, states, memories, costs, rng)
+        finally:
+            if executor:
+                executor.shutdown()
+                release_graph(blocks)
+
+        return best_solution, best_distance
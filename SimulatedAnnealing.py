@@ -1,20 +1,13 @@
 import itertools
 import math
 import random
-import pandas as pd
 
-from utils.GenerateData import generate_data
-from TSP import TSP
-from utils.GraphCreator import GraphCreator
 from interfaces import Problem
 from collections import defaultdict
 import statistics
 import time
-import matplotlib.pyplot as plt
 import numpy as np
 
-from utils import get_centrality_data, get_data
-
 
 def probability(energy_change, temperature):
     """
@@ -34,7 +27,8 @@ class SimulatedAnnealing:
         self.problem = general_functions
 
     def find_solution(self, minimum_temperature: float, initial_temperature: float,
-                      cooling_factor: float, n: int, multipl: float = 2, max_try: int = 50):
+                      cooling_factor: float, n: int, multipl: float = 2, max_try: int = 50, candidates: int = 1,
+                      initial_state=None):
         """
         A function to find a solution to a given problem using simulated annealing
         :param minimum_temperature: The minimum temperature for the algorithm to stop the search.
@@ -43,6 +37,9 @@ class SimulatedAnnealing:
         :param n: The number of iterations before the cool down
         :param multipl: The multiplier is used to calculate the restart threshold
         :param max_try: The max number of tries before stop the recursion.
+        :param candidates: The number of future states proposed on each iteration. With more than one, the
+        candidates are generated, scored and checked in batch and the best of them is the one considered to move.
+        :param initial_state: A state to start the search from (warm start), by default problem.start() is used.
         :return:
         """
         problem = self.problem
@@ -50,7 +47,7 @@ class SimulatedAnnealing:
         try_counter = 0
 
         def simulated_annealing():
-            problem.update_current_state(problem.start())
+            problem.update_current_state(problem.start() if initial_state is None else list(initial_state))
 
             best_solution = problem.get_current_state()  # at this point this might not be a solution
             best_score = problem.get_cost(best_solution)
@@ -58,10 +55,27 @@ class SimulatedAnnealing:
 
             while temperature > minimum_temperature:
                 for _ in range(n):  # This to follow the algorithm discussed during  class
-                    # Calculate energy change based on possible future state
-                    future_state = problem.get_random_future_state()
-                    current_cost = problem.get_cost(problem.get_current_state())
-                    future_cost = problem.get_cost(future_state)
+                    if candidates > 1:
+                        # Score the current state and all candidates in one call and keep the best candidate
+                        future_states = problem.get_random_future_states(candidates)
+                        costs = np.asarray(problem.get_costs([problem.get_current_state()] + future_states))
+                        current_cost, future_costs = costs[0], costs[1:]
+                        best_candidate = int(np.argmax(future_costs))
+                        future_state, future_cost = future_states[best_candidate], future_costs[best_candidate]
+                        problem.select_future_state(future_state)
+
+                        # A candidate might be a better solution even if the search does not move to it
+                        solutions = np.asarray(problem.are_solutions(future_states), dtype=bool)
+                        if solutions.any():
+                            best_solved = int(np.flatnonzero(solutions)[np.argmax(future_costs[solutions])])
+                            if future_costs[best_solved] > best_score:
+                                best_solution = future_states[best_solved]
+                                best_score = future_costs[best_solved]
+                    else:
+                        # Calculate energy change based on possible future state
+                        future_state = problem.get_random_future_state()
+                        current_cost = problem.get_cost(problem.get_current_state())
+                        future_cost = problem.get_cost(future_state)
                     energy_change = future_cost - current_cost
 
                     # execute with probability,  or it's a closer state to a solution based on the cost
@@ -89,17 +103,21 @@ class SimulatedAnnealing:
         return problem.get_current_state(), 1 / (problem.get_cost(problem.get_current_state())+0.00000001) # to avoid zero division error
 
     def best_of_x(self, x: int, minimum_temperature: float, initial_temperature: float,
-                  cooling_factor: float, n: int, multipl: float = 2):
+                  cooling_factor: float, n: int, multipl: float = 2, candidates: int = 1, time_budget: float = None):
         """
         Run find_solution x times see parameters on find_solution method
+        :param time_budget: If given, stop after the run that exceeds this number of seconds
         """
 
+        start_time = time.time()
         best_solution, best_distance = [], float('inf')
         for _ in range(x):
             solution, distance = self.find_solution(minimum_temperature, initial_temperature, cooling_factor, n,
-                                                    multipl=multipl)
+                                                    multipl=multipl, candidates=candidates)
             if distance < best_distance:
                 best_solution, best_distance = solution, distance
+            if time_budget is not None and time.time() - start_time >= time_budget:
+                break
         return best_solution, best_distance
 
     def get_best_parameters(self, parameters, minimum_temperature=10, executions_per_combination=10, multipl: int = 2):
@@ -153,6 +171,8 @@ class SimulatedAnnealing:
         Parameters:
             Explained on find_solution
         """
+        # matplotlib is only needed here, importing it at the top slows down every worker that imports this module
+        import matplotlib.pyplot as plt
 
         distances = []
 
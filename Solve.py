@@ -0,0 +1,71 @@
+"""
+Solve a TSP instance from a local file and print the tour, without Neo4j.
+
+    python -m Solve distance_matrix.csv --start-node l1
+
+The instance is a distance matrix CSV with the layout of distance_matrix.csv, or a .npz file written by
+CSRGraph.save. The centralities are read from a CSV with a name column, by default the degree of each node is used.
+"""
+import argparse
+import random
+
+import numpy as np
+import pandas as pd
+
+from SimulatedAnnealing import SimulatedAnnealing
+from TSP import TSP
+from utils.CSRGraph import CSRGraph
+
+
+def load_instance(path):
+    """
+    :param path: a .csv distance matrix or a .npz graph
+    :return: a CSRGraph
+    """
+    if path.endswith('.npz'):
+        return CSRGraph.load(path)
+    return CSRGraph.from_matrix(pd.read_csv(path))
+
+
+def degree_centrality(graph: CSRGraph):
+    """
+    :return: a centrality dataframe with the degree of every node
+    """
+    return pd.DataFrame({'name': graph.names, 'degree': np.diff(graph.indptr).astype(float)})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Solve a TSP instance with simulated annealing')
+    parser.add_argument('instance', help='distance matrix .csv or graph .npz')
+    parser.add_argument('--start-node', help='by default the first node of the instance')
+    parser.add_argument('--centrality', help='CSV with a name column and one column per centrality measure')
+    parser.add_argument('--memory-size', type=int, default=2)
+    parser.add_argument('--x', type=int, default=10)
+    parser.add_argument('--minimum-temperature', type=float, default=1)
+    parser.add_argument('--initial-temperature', type=float, default=2000)
+    parser.add_argument('--cooling-factor', type=float, default=0.4)
+    parser.add_argument('--n', type=int, default=8)
+    parser.add_argument('--multipl', type=float, default=2)
+    parser.add_argument('--candidates', type=int, default=1)
+    parser.add_argument('--time-budget', type=float)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    if args.seed is not None:
+        random.seed(args.seed)
+        np.random.seed(args.seed)
+
+    graph = load_instance(args.instance)
+    centrality_df = pd.read_csv(args.centrality) if args.centrality else degree_centrality(graph)
+    tsp = TSP(graph, args.start_node or graph.names[0], centrality_df, memory_size=args.memory_size)
+
+    tour, distance = SimulatedAnnealing(tsp).best_of_x(
+        x=args.x, minimum_temperature=args.minimum_temperature, initial_temperature=args.initial_temperature,
+        cooling_factor=args.cooling_factor, n=args.n, multipl=args.multipl, candidates=args.candidates,
+        time_budget=args.time_budget)
+    print(' '.join(map(str, tour)))
+    print(distance)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from SimulatedAnnealing import SimulatedAnnealing
+from TSP import TSP
+from utils.GraphSource import Neo4jGraphSource, graph_hash
+from utils.SharedGraph import attach_graph, share_graph, release_graph
+
+# Prepared TSP instances of the current pool worker, by graph hash
+_worker_cache = OrderedDict()
+
+
+def _get_worker_problem(key, spec, centrality_df, cache_size):
+    """
+    Return the TSP of a graph from the cache of the worker, attaching to the shared graph the first time.
+    """
+    if key in _worker_cache:
+        _worker_cache.move_to_end(key)
+        return _worker_cache[key][0]
+
+    graph, blocks = attach_graph(spec)
+    _worker_cache[key] = (TSP(graph, graph.names[0], centrality_df), blocks)
+    while len(_worker_cache) > cache_size:
+        problem, blocks = _worker_cache.popitem(last=False)[1]
+        del problem  # The arrays over the blocks must be freed before closing them
+        release_graph(blocks, unlink=False)
+    return _worker_cache[key][0]
+
+
+def _solve_in_worker(key, spec, centrality_df, cache_size, start_node, memory_size, parameters, time_budget):
+    tsp = _get_worker_problem(key, spec, centrality_df, cache_size).with_start_node(start_node)
+    tsp.memory_size = memory_size
+    return SimulatedAnnealing(tsp).best_of_x(time_budget=time_budget, **parameters)
+
+
+def _load_graph(source, reference):
+    """
+    Load a graph from the source and hash it, run in a thread by get_graph.
+    :return: (CSRGraph, centrality_df, hash)
+    """
+    graph, centrality_df = source.load(reference)
+    return graph, centrality_df, graph_hash(graph, centrality_df)
+
+
+class PreparedGraph:
+    """
+    A graph loaded from a source and placed in shared memory for the workers.
+    The shared memory is freed once the graph is evicted from the cache and no request is using it.
+    """
+
+    def __init__(self, key, graph, centrality_df):
+        self.key = key
+        self.graph = graph
+        self.centrality_df = centrality_df
+        self.spec, self.blocks = share_graph(graph)
+        self.users = 0
+        self.evicted = False
+
+    def acquire(self):
+        self.users += 1
+
+    def release(self):
+        self.users -= 1
+        if self.evicted and self.users == 0:
+            release_graph(self.blocks)
+
+    def evict(self):
+        self.evicted = True
+        if self.users == 0:
+            release_graph(self.blocks)
+
+
+class SolveService:
+    """
+    Long-running service that solves TSP requests with SimulatedAnnealing.
+
+    The graphs are kept in an LRU cache keyed by the hash of their content, and the solves run in a process pool
+    whose workers keep the prepared TSP instances, so a request only pays the solve time once its graph is warm.
+    At most max_pending requests are accepted at the same time, the rest wait to be read (backpressure).
+    """
+
+    # Default parameters of best_of_x, each request can override them
+    default_parameters = dict(x=10, minimum_temperature=1, initial_temperature=2000, cooling_factor=0.4, n=8)
+
+    def __init__(self, source, processes: int = None, cache_size: int = 8, max_pending: int = 64):
+        """
+        :param source: object with a load(reference) method returning (CSRGraph, centrality_df)
+        :param processes: The number of worker processes, by default one per core
+        :param cache_size: The number of graphs kept in memory
+        :param max_pending: The number of requests accepted at the same time
+        """
+        self.source = source
+        self.cache_size = cache_size
+        self.max_pending = max_pending
+        # Forked workers would inherit the sockets of the open connections and keep them open after they are closed
+        self.executor = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn'))
+        self._cache = OrderedDict()
+        self._hashes = {}
+        self._load_locks = {}
+        self._slots = None
+
+    async def get_graph(self, reference, reload=False):
+        """
+        Return the prepared graph of a reference, loading it from the source if it is not in the cache.
+        Cache hits never wait, and only the requests for the same reference wait while it is being loaded.
+        """
+        key = self._hashes.get(reference)
+        if key in self._cache and not reload:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        async with self._load_locks.setdefault(reference, asyncio.Lock()):
+            # Another request may have loaded the reference while this one was waiting
+            if self._hashes.get(reference) != key and self._hashes.get(reference) in self._cache:
+                key = self._hashes[reference]
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+            # Loading, hashing and copying the arrays to shared memory run in threads, the loop keeps serving
+            loop = asyncio.get_running_loop()
+            graph, centrality_df, key = await loop.run_in_executor(None, _load_graph, self.source, reference)
+            if key not in self._cache:
+                prepared = await loop.run_in_executor(None, PreparedGraph, key, graph, centrality_df)
+                if key in self._cache:  # Another reference with the same content was prepared meanwhile
+                    prepared.evict()
+                else:
+                    self._cache[key] = prepared
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)[1].evict()
+            self._hashes[reference] = key
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+    async def solve(self, request):
+        """
+        Solve a request.
+
+        :param request: dict with graph (the reference for the source), start_node, and optionally parameters
+        (for best_of_x), memory_size, time_budget (seconds) and reload (to read the graph again)
+        :return: dict with tour and distance
+        """
+        parameters = {**self.default_parameters, **request.get('parameters', {})}
+        if parameters['x'] < 1:
+            # best_of_x would return an empty tour with an infinite distance, which is not valid JSON
+            raise ValueError('x must be at least 1')
+        prepared = await self.get_graph(request.get('graph'), reload=request.get('reload', False))
+        loop = asyncio.get_running_loop()
+        prepared.acquire()
+        try:
+            tour, distance = await loop.run_in_executor(
+                self.executor, _solve_in_worker, prepared.key, prepared.spec, prepared.centrality_df,
+                self.cache_size, request['start_node'], request.get('memory_size', 2), parameters,
+                request.get('time_budget'))
+        finally:
+            prepared.release()
+        return {'tour': tour, 'distance': distance}
+
+    async def handle(self, line):
+        """
+        Solve a JSON request and return the JSON response, errors are reported in the response.
+        """
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            response = await self.solve(request)
+        except Exception as e:
+            response = {'error': f'{type(e).__name__}: {e}'}
+        return json.dumps({'id': request_id, **response})
+
+    async def serve(self, reader, writer):
+        """
+        Read JSON lines from reader and write a JSON line per response to writer, in the order they finish.
+        The pending requests of all the connections share the max_pending slots.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        slots = self._slots
+        tasks = set()
+
+        async def respond(line):
+            try:
+                writer.write((await self.handle(line) + '\n').encode())
+                await writer.drain()
+            finally:
+                slots.release()
+
+        while line := await reader.readline():
+            if not line.strip():
+                continue
+            await slots.acquire()
+            task = asyncio.create_task(respond(line))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+
+    def close(self):
+        self.executor.shutdown()
+        for prepared in self._cache.values():
+            prepared.evict()
+        self._cache.clear()
+
+
+class _StdoutWriter:
+    """
+    Minimal stream writer over sys.stdout for serve.
+    """
+
+    def write(self, data):
+        sys.stdout.buffer.write(data)
+
+    async def drain(self):
+        sys.stdout.buffer.flush()
+
+
+async def serve_stdio(service: SolveService):
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    await service.serve(reader, _StdoutWriter())
+
+
+async def serve_tcp(service: SolveService, host, port):
+    async def serve_connection(reader, writer):
+        try:
+            await service.serve(reader, writer)
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    server = await asyncio.start_server(serve_connection, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='TSP solve service, JSON lines over stdin/stdout or TCP')
+    parser.add_argument('--port', type=int, help='listen on this TCP port instead of stdin/stdout')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--processes', type=int)
+    parser.add_argument('--cache-size', type=int, default=8)
+    parser.add_argument('--max-pending', type=int, default=64)
+    args = parser.parse_args(argv)
+
+    service = SolveService(Neo4jGraphSource(), processes=args.processes, cache_size=args.cache_size,
+                           max_pending=args.max_pending)
+    try:
+        if args.port:
+            asyncio.run(serve_tcp(service, args.host, args.port))
+        else:
+            asyncio.run(serve_stdio(service))
+    finally:
+        service.close()
+
+
+if __name__ == '__main__':
+    main()
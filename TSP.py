@@ -1,26 +1,74 @@
+import copy
+import itertools
 import random
+import numpy as np
 import pandas as pd
 from interfaces import Problem
+from utils.CSRGraph import CSRGraph
+from utils.LocalCentrality import merge_centralities, update_local_centralities
 
 
 class TSP(Problem):
 
     def __init__(self, graph_data, start_node, centrality_df: pd.DataFrame, memory_size=2):
         """
-        :param graph_data: A dictionary containing the graph
+        :param graph_data: A list of dicts containing the graph, as returned by get_data, or a CSRGraph
         :param start_node: A node to start the route
         :param centrality_df: a dataframe containing the nodes and some centrality measures
         """
         self.start_node = start_node
-        self.graph_data = graph_data
-        self.distance_dict = self.get_distance_dict()
+        self.graph = graph_data if isinstance(graph_data, CSRGraph) else CSRGraph.from_edges(graph_data)
+        self.node_index = self.graph.index
         self.nodes = self.init_nodes()
         self.initial_state = self.start()
         self.state = self.initial_state
         self.centrality_df = centrality_df
+        self.centrality_matrix = self.get_centrality_matrix()
         self.memory = set()
         self.memory_size = memory_size
 
+    def with_start_node(self, start_node):
+        """
+        Create a TSP over the same graph with another start node. The graph, the node indices and the centrality
+        data are shared with this instance instead of being computed again.
+
+        :param start_node: A node to start the route
+        :return: a new TSP with an empty memory
+        """
+        tsp = copy.copy(self)
+        tsp.start_node = start_node
+        tsp.nodes = tsp.init_nodes()
+        tsp.memory = set()
+        tsp.initial_state = tsp.start()
+        tsp.state = tsp.initial_state
+        return tsp
+
+    def update_graph(self, inserted=(), deleted=(), changed=()):
+        """
+        Apply a delta of edges to the graph and update the nodes and the local centralities of the affected nodes.
+        Changing distances does not change any centrality, because they are computed without weights.
+
+        :param inserted: list of dicts with start, end and distance of new edges
+        :param deleted: list of dicts with start and end of the edges to remove
+        :param changed: list of dicts with start, end and the new distance of existing edges
+        :return: the names of the nodes whose neighbors changed
+        """
+        affected = self.graph.apply_delta(inserted, deleted, changed)
+        self.nodes = self.init_nodes()
+        if affected:
+            self.centrality_df = update_local_centralities(self.centrality_df, self.graph, affected)
+            self.centrality_matrix = self.get_centrality_matrix()
+        return affected
+
+    def update_centralities(self, values: pd.DataFrame):
+        """
+        Replace some centrality values, for example the global measures computed again after changing the graph.
+
+        :param values: dataframe with a name column and the measures to replace
+        """
+        self.centrality_df = merge_centralities(self.centrality_df, values)
+        self.centrality_matrix = self.get_centrality_matrix()
+
     def start(self):
         """
         Extracts nodes from the graph data, ensuring the start node is first in the list.
@@ -35,18 +83,17 @@ class TSP(Problem):
         visited = {current_node}
 
         while True:
-            # Filter connections that start from the current node and lead to unvisited nodes
-            possible_moves = [conn for conn in self.graph_data if
-                              conn['start'] == current_node and conn['end'] not in visited]
+            # Filter the neighbors of the current node that are not visited
+            possible_moves = [self.graph.names[i] for i in self.graph.neighbors(self.node_index[current_node])
+                              if self.graph.names[i] not in visited]
 
             if len(path) > 0.5 * len(self.get_nodes()) or not possible_moves:
                 break
 
-            # Choose a random connection from the possible moves
-            next_move = random.choice(possible_moves)
+            # Choose a random neighbor from the possible moves
+            current_node = random.choice(possible_moves)
 
-            # Update the current node, path, and visited nodes
-            current_node = next_move['end']
+            # Update the path and visited nodes
             path.append(current_node)
             visited.add(current_node)
         return path
@@ -58,21 +105,35 @@ class TSP(Problem):
         Returns:
             list: A list of nodes starting with the start node.
         """
-        locations = set([conn['start'] for conn in self.graph_data] + [conn['end'] for conn in self.graph_data])
-        locations = list(locations - {self.start_node})
-        return [self.start_node] + locations
+        return [self.start_node] + [node for node in self.graph.names if node != self.start_node]
 
-    def get_distance_dict(self):
+    def get_centrality_matrix(self):
         """
-        Take the initial list of dicts and create a dictionary containing as key pair of nodes.
+        Align the centrality measures with the node indices of the graph so they can be used with numpy.
+        Nodes without centrality data get NaN, and are never selected as a move.
         Returns:
-            dict: A dictionary with pair of nodes as key.
+            np.ndarray: A (n, m) matrix with one column per metric of get_available_metrics.
+        """
+        metrics = self.get_available_metrics()
+        aligned = self.centrality_df.set_index('name').reindex(self.graph.names)
+        return aligned[metrics].to_numpy(dtype=float)
+
+    def encode_states(self, states):
         """
-        data = self.graph_data
-        distance_dict = {(d['start'], d['end']): d['distance'] for d in data}
-        for d in data:  # Add reverse directions
-            distance_dict[(d['end'], d['start'])] = d['distance']
-        return distance_dict
+        Flatten a batch of tours into arrays of node indices.
+
+        :param states: A list of tours
+        :return: flat node indices, the tour each position belongs to, and the index of the next position on the
+                 same tour (the last node of a tour is followed by the first one)
+        """
+        lengths = np.fromiter((len(state) for state in states), dtype=np.int64, count=len(states))
+        flat = np.fromiter((self.node_index[node] for state in states for node in state), dtype=np.int64,
+                           count=int(lengths.sum()))
+        tour_ids = np.repeat(np.arange(len(states)), lengths)
+        offsets = np.cumsum(lengths) - lengths
+        next_position = np.arange(len(flat)) + 1
+        next_position[offsets + lengths - 1] = offsets
+        return flat, tour_ids, next_position
 
     def get_available_moves(self):
         """
@@ -80,24 +141,13 @@ class TSP(Problem):
         :return: A list of node names that are directly connected to the last node in the tour.
         """
 
-        tour = self.state.copy()
-        if not tour:  # If the tour is empty, return an empty list
+        if not self.state:  # If the tour is empty, return an empty list
             return []
 
-        last_node = tour[-1]  # Get the last node in the tour
-
-        # Find all nodes that are connected to the last node
-        # This includes checking both directions since the graph may be undirected or have bidirectional edges
-        available_moves = []
+        last_node = self.state[-1]  # Get the last node in the tour
 
-        for (start_node, end_node), _ in self.distance_dict.items():
-            if start_node == last_node and end_node and end_node not in available_moves:
-                available_moves.append(end_node)
-            elif end_node == last_node and start_node and start_node not in available_moves:
-                available_moves.append(start_node)
-        # print(f"state:{self.state}, tour : {tour}, memory {self.memory}, moves: {available_moves}")
-
-        return available_moves
+        # The graph stores both directions of every edge, so the row of the last node has all its neighbors
+        return [self.graph.names[i] for i in self.graph.neighbors(self.node_index[last_node])]
 
     def get_random_future_state(self):
         """
@@ -110,6 +160,60 @@ class TSP(Problem):
         state = self.generate_random_future_state(available_moves)
         return state
 
+    def get_random_future_states(self, k):
+        """
+        Vectorized version of get_random_future_state, it proposes up to k candidates from the current state.
+        Every candidate picks a random metric and appends the node with the highest adjusted centrality, as in
+        find_highest_centrality_node, but all metrics are scored at once over the same memory.
+        All the candidates come from the same state and memory, so repeated tours are dropped and there are at
+        most as many candidates as available metrics. The memory is not updated here, see select_future_state.
+        :param k: the number of candidates
+        Returns:
+            list: up to k different tours.
+        """
+        current_state = self.state
+        available_metrics = self.get_available_metrics()
+        if not available_metrics or len(current_state) == 0:
+            return [current_state.copy()]
+
+        current_node = self.node_index[current_state[-1]]
+        moves = self.graph.neighbors(current_node)
+        moves = moves[moves != current_node]
+        if self.memory:
+            in_memory = [self.node_index[node] for node in self.memory]
+            moves = moves[~np.isin(moves, in_memory)]
+        if moves.size == 0:
+            return [current_state.copy()]
+
+        # Same adjustment as find_highest_centrality_node, nodes already on the tour lose weight
+        weight = 0.9
+        visited = np.isin(moves, [self.node_index[node] for node in current_state])
+        adjusted = self.centrality_matrix[moves] - (visited[:, None] * weight)
+        adjusted = np.where(np.isnan(adjusted), -np.inf, adjusted)
+
+        best_per_metric = moves[np.argmax(adjusted, axis=0)]
+        valid_metric = np.isfinite(adjusted.max(axis=0))
+
+        # None stands for a metric without a valid move, the candidate is the current state
+        next_nodes = [best_per_metric[metric] if valid_metric[metric] else None
+                      for metric in np.random.randint(len(available_metrics), size=k)]
+        candidates = []
+        for node in dict.fromkeys(next_nodes):
+            if node is None:
+                candidates.append(current_state.copy())
+            else:
+                candidates.append(current_state + [self.graph.names[node]])
+        return candidates
+
+    def select_future_state(self, state):
+        """
+        Record in memory the node appended by the candidate selected from get_random_future_states, as
+        transition_to_highest_centrality does for the scalar path.
+        :param state: the selected candidate
+        """
+        if len(state) == len(self.state) + 1:
+            self.update_memory(state[-1])
+
     def get_available_metrics(self):
         return self.centrality_df.columns.difference(['name']).tolist()
 
@@ -207,12 +311,9 @@ class TSP(Problem):
         :param sequence: a tour
         :return: boolean
         """
-        for i in range(len(sequence) - 1):
-            if ((sequence[i], sequence[i + 1]) not in self.distance_dict
-                    and (sequence[i + 1], sequence[i]) not in self.distance_dict):
-                return False  # Check if consecutive locations are connected
-
-        return True
+        # Check if consecutive locations are connected
+        indices = [self.node_index[node] for node in sequence]
+        return bool(np.isfinite(self.graph.edge_weights(indices[:-1], indices[1:])).all())
 
     def is_solution(self, sequence):
         # even tho this method does not verify if the last node is connected with the first, in the cost function we
@@ -221,6 +322,17 @@ class TSP(Problem):
             return False  # Check if all locations are visited at least once
         return True
 
+    def are_solutions(self, states):
+        """
+        Vectorized version of is_solution.
+        :param states: a list of tours
+        :return: a boolean array, one value per tour
+        """
+        flat, tour_ids, _ = self.encode_states(states)
+        visited = np.zeros((len(states), len(self.nodes)), dtype=bool)
+        visited[tour_ids, flat] = True
+        return visited.all(axis=1)
+
     def heuristic(self, state):
         # we are going to use get_cost as heuristic
         return self.get_cost(state)
@@ -234,27 +346,14 @@ class TSP(Problem):
         :return: the fitness (high is better)
         """
 
-        total_distance = 0
-        visited_nodes = set()
-
-        # Calculate total distance and track visited nodes
-        for i in range(len(state)):
-            start = state[i]
-            end = state[(i + 1) % len(state)]
-            visited_nodes.add(start)  # Track visited nodes
-
-            # Check if the connection exists and add its distance
-            if (start, end) in self.distance_dict:
-                total_distance += self.distance_dict[(start, end)]
-            elif (end, start) in self.distance_dict:
-                total_distance += self.distance_dict[(end, start)]
-            else:
-                # If a connection doesn't exist, assign a large penalty
-                total_distance += float('inf')
-                break  # Exit early as the tour is invalid
-
-        # Ensure the last node is also considered visited
-        visited_nodes.add(state[-1])
+        # Look up every connection of the tour at once, a missing connection has an infinite distance
+        # The first node is repeated at the end to close the cycle
+        indices = np.fromiter((self.node_index[node] for node in itertools.chain(state, state[:1])), dtype=np.int64)
+        distances = self.graph.edge_weights(indices[:-1], indices[1:])
+        if not np.isfinite(distances).all():
+            return 0.0  # Exit early as the tour is invalid, 1 / inf
+        total_distance = float(distances.sum())
+        visited_nodes = set(state)
 
         # Calculate penalties for missing nodes
         missing_nodes = set(self.nodes) - visited_nodes
@@ -267,6 +366,25 @@ class TSP(Problem):
         # Return the adjusted fitness
         return 1/total_cost
 
+    def get_costs(self, states):
+        """
+        Vectorized version of get_cost, all the tours are scored with numpy at once.
+
+        :param states: A list of tours
+        :return: an array with the fitness of each tour (high is better)
+        """
+        flat, tour_ids, next_position = self.encode_states(states)
+        edge_distances = self.graph.edge_weights(flat, flat[next_position])
+        total_distance = np.bincount(tour_ids, weights=edge_distances, minlength=len(states))
+
+        visited = np.zeros((len(states), len(self.nodes)), dtype=bool)
+        visited[tour_ids, flat] = True
+        missing_nodes = len(self.nodes) - visited.sum(axis=1)
+        penalty_per_missing_node = 10000
+
+        total_cost = total_distance + penalty_per_missing_node * missing_nodes
+        return 1 / total_cost
+
     def get_initial_state(self):
         """
         :return: A tour
@@ -0,0 +1 @@
+# Makes the modules at the root of the repository importable from the tests
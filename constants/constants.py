@@ -16,35 +16,60 @@ queries_dict = {
             RETURN a.name AS start, b.name AS end, r.distance AS distance
         ''',
 
-    'page_rank': '''
-        CALL gds.pageRank.stream('virtual')
-        YIELD nodeId, score AS pagerank
-        WITH gds.util.asNode(nodeId) AS node, pagerank
-        RETURN node.name AS name, toFloat(pagerank) AS pagerank
-        ORDER BY pagerank DESC;
-    ''',
-
-    'degree': '''
-        CALL gds.degree.stream('virtual')
-        YIELD nodeId, score as degree
-        WITH gds.util.asNode(nodeId) AS node, degree
-        RETURN node.name AS name, degree
-        ORDER BY degree DESC;
-    ''',
-
-    'closeness': '''
-        CALL gds.closeness.stream('virtual')
-        YIELD nodeId, score AS closeness
-        WITH gds.util.asNode(nodeId) AS node, closeness
-        RETURN node.name AS name, toFloat(closeness) AS closeness
-        ORDER BY closeness DESC;
-    ''',
-
-    'clustering': '''
-        CALL gds.localClusteringCoefficient.stream('virtual')
-        YIELD nodeId, localClusteringCoefficient
-        WITH gds.util.asNode(nodeId) AS node, localClusteringCoefficient
-        RETURN node.name AS name, toFloat(localClusteringCoefficient) AS clustering
-        ORDER BY clustering DESC;
-    '''
+    'graph_meta': '''
+        OPTIONAL MATCH (m:GraphMeta {name: 'virtual'})
+        RETURN properties(m) AS meta, gds.graph.exists('virtual') AS projected
+    ''',
+
+    'bump_version': '''
+        MERGE (m:GraphMeta {name: 'virtual'})
+        SET m.version = coalesce(m.version, 0) + 1
+    ''',
+
+    'set_meta': '''
+        MERGE (m:GraphMeta {name: 'virtual'})
+        SET m += $properties
+    ''',
+
+    'write_page_rank': '''
+        CALL gds.pageRank.write('virtual', {writeProperty: 'pagerank'})
+        YIELD nodePropertiesWritten
+        RETURN nodePropertiesWritten
+    ''',
+
+    'write_degree': '''
+        CALL gds.degree.write('virtual', {writeProperty: 'degree'})
+        YIELD nodePropertiesWritten
+        RETURN nodePropertiesWritten
+    ''',
+
+    'write_closeness': '''
+        CALL gds.closeness.write('virtual', {writeProperty: 'closeness'})
+        YIELD nodePropertiesWritten
+        RETURN nodePropertiesWritten
+    ''',
+
+    'write_clustering': '''
+        CALL gds.localClusteringCoefficient.write('virtual', {writeProperty: 'clustering'})
+        YIELD nodePropertiesWritten
+        RETURN nodePropertiesWritten
+    ''',
 }
+
+# Centrality measure -> property written on the nodes and column of the centrality dataframe
+centrality_columns = {
+    'page_rank': 'pagerank',
+    'degree': 'degree',
+    'closeness': 'closeness',
+    'clustering': 'clustering',
+}
+
+
+def read_centralities_query(measures):
+    """
+    Build a query that reads the written centralities of all the nodes in a single row, one list per column,
+    missing values are returned as NaN to keep the lists aligned.
+    """
+    columns = [f"collect(coalesce(toFloat(l.{centrality_columns[measure]}), toFloat('NaN'))) "
+               f"AS {centrality_columns[measure]}" for measure in measures]
+    return 'MATCH (l:Location) RETURN ' + ', '.join(['collect(l.name) AS name'] + columns)
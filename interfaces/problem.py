@@ -19,6 +19,29 @@ class Problem(ABC):
         """
         pass
 
+    def get_random_future_states(self, k):
+        """
+        Generate up to k candidate future states from the current state in a single call.
+        Subclasses can override this to propose candidates in bulk, by default it calls get_random_future_state.
+
+        Parameters:
+            k: The number of candidates to generate.
+
+        Returns:
+            A list with up to k candidate future states.
+        """
+        return [self.get_random_future_state() for _ in range(k)]
+
+    def select_future_state(self, state):
+        """
+        Notify the problem which of the candidates of get_random_future_states the algorithm considers, so it can
+        update any internal state tied to a move. By default it does nothing.
+
+        Parameters:
+            state: The selected candidate.
+        """
+        pass
+
     @abstractmethod
     def validate_state(self, state):
         """
@@ -45,6 +68,18 @@ class Problem(ABC):
         """
         pass
 
+    def are_solutions(self, states):
+        """
+        Check a batch of states at once. By default it calls is_solution for each state.
+
+        Parameters:
+            states: A list of states to validate.
+
+        Returns:
+            A sequence of booleans, one per state.
+        """
+        return [self.is_solution(state) for state in states]
+
     @abstractmethod
     def start(self):
         """
@@ -68,6 +103,19 @@ class Problem(ABC):
         """
         pass
 
+    def get_costs(self, states):
+        """
+        Calculate the cost of a batch of states at once. Subclasses can override this to score all the states
+        with a single vectorized operation, by default it calls get_cost for each state.
+
+        Parameters:
+            states: A list of states.
+
+        Returns:
+            A sequence with the cost of each state, in the same order.
+        """
+        return [self.get_cost(state) for state in states]
+
     @abstractmethod
     def heuristic(self, state):
         """
@@ -0,0 +1,105 @@
+import random
+
+import numpy as np
+import pytest
+
+from utils.CSRGraph import CSRGraph
+
+
+def build(names, edges):
+    """
+    Build a graph from a dictionary {(a, b): distance} of node indices.
+    """
+    pairs = list(edges)
+    return CSRGraph.from_arrays(names, [a for a, _ in pairs], [b for _, b in pairs], [edges[p] for p in pairs])
+
+
+def as_conn(names, a, b, distance=None):
+    # Use both directions, as the database stores them
+    start, end = (names[a], names[b]) if random.random() < 0.5 else (names[b], names[a])
+    conn = {'start': start, 'end': end}
+    if distance is not None:
+        conn['distance'] = distance
+    return conn
+
+
+def assert_same_graph(graph, expected):
+    assert graph.names == expected.names
+    np.testing.assert_array_equal(graph.indptr, expected.indptr)
+    np.testing.assert_array_equal(graph.indices, expected.indices)
+    np.testing.assert_array_equal(graph.weights, expected.weights)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_apply_delta_matches_rebuild(seed):
+    random.seed(seed)
+    n = 15
+    names = [f'l{i}' for i in range(n)]
+    all_pairs = [(a, b) for a in range(n) for b in range(a + 1, n)]
+    edges = {pair: float(random.randint(1, 10)) for pair in random.sample(all_pairs, 40)}
+    graph = build(names, edges)
+
+    existing = list(edges)
+    random.shuffle(existing)
+    deleted_pairs, changed_pairs = existing[:8], existing[8:16]
+    inserted_pairs = random.sample([pair for pair in all_pairs if pair not in edges], 8)
+
+    # Every edge appears twice in the delta, sometimes in the other direction
+    deleted = [as_conn(names, a, b) for a, b in deleted_pairs for _ in range(2)]
+    changed = [as_conn(names, a, b, float(random.randint(1, 10))) for a, b in changed_pairs for _ in range(2)]
+    inserted = [as_conn(names, a, b, float(random.randint(1, 10))) for a, b in inserted_pairs for _ in range(2)]
+
+    for pair in deleted_pairs:
+        del edges[pair]
+    for conn in changed + inserted:  # The last distance of an edge wins
+        a, b = sorted((names.index(conn['start']), names.index(conn['end'])))
+        edges[(a, b)] = conn['distance']
+
+    affected = graph.apply_delta(inserted, deleted, changed)
+
+    assert_same_graph(graph, build(names, edges))
+    assert set(affected) == {names[node] for pair in deleted_pairs + inserted_pairs for node in pair}
+
+
+def test_apply_delta_adds_new_nodes():
+    graph = CSRGraph.from_edges([{'start': 'a', 'end': 'b', 'distance': 1}])
+    graph.apply_delta(inserted=[{'start': 'b', 'end': 'c', 'distance': 2}, {'start': 'c', 'end': 'b', 'distance': 3}])
+
+    assert graph.names == ['a', 'b', 'c']
+    assert graph.weight(1, 2) == graph.weight(2, 1) == 3
+    np.testing.assert_array_equal(graph.neighbors(1), [0, 2])
+
+
+def test_apply_delta_rejects_invalid_edges():
+    graph = CSRGraph.from_edges([{'start': 'a', 'end': 'b', 'distance': 1}, {'start': 'b', 'end': 'c', 'distance': 1}])
+
+    with pytest.raises(ValueError):
+        graph.apply_delta(deleted=[{'start': 'a', 'end': 'c'}])
+    with pytest.raises(ValueError):
+        graph.apply_delta(inserted=[{'start': 'b', 'end': 'a', 'distance': 2}])
+    with pytest.raises(ValueError):
+        graph.apply_delta(changed=[{'start': 'a', 'end': 'a', 'distance': 2}])
+
+
+def test_edge_weights_match_weight():
+    rng = np.random.default_rng(0)
+    n = 300
+    graph = CSRGraph.from_arrays([f'l{i}' for i in range(n)], rng.integers(0, n, 3000), rng.integers(0, n, 3000),
+                                 rng.random(3000))
+    sources, targets = rng.integers(0, n, 2000), rng.integers(0, n, 2000)
+    expected = [graph.weight(a, b) for a, b in zip(sources, targets)]
+
+    np.testing.assert_array_equal(graph.edge_weights(sources, targets), expected)
+
+
+def test_search_returns_the_insert_position():
+    rng = np.random.default_rng(1)
+    n = 50
+    graph = CSRGraph.from_arrays([f'l{i}' for i in range(n)], rng.integers(0, n, 200), rng.integers(0, n, 200),
+                                 rng.random(200))
+    sources, targets = rng.integers(0, n, 1000), rng.integers(0, n, 1000)
+    position, found = graph.search(sources, targets)
+
+    rows = [graph.indptr[a] + np.searchsorted(graph.neighbors(a), b) for a, b in zip(sources, targets)]
+    np.testing.assert_array_equal(position, rows)
+    np.testing.assert_array_equal(found, [graph.weight(a, b) != float('inf') for a, b in zip(sources, targets)])
@@ -0,0 +1,79 @@
+import random
+
+import pandas as pd
+import pytest
+
+from IncrementalSolver import IncrementalSolver
+from TSP import TSP
+
+EDGES = [('a', 'b', 2), ('a', 'c', 4), ('b', 'c', 1), ('b', 'd', 5), ('c', 'd', 3), ('c', 'e', 6), ('d', 'e', 2)]
+
+
+def make_solver(edges):
+    graph_data = [{'start': start, 'end': end, 'distance': distance} for start, end, distance in edges]
+    names = sorted({name for edge in edges for name in edge[:2]})
+    centrality_df = pd.DataFrame({'name': names, 'degree': [1.0] * len(names)})
+    return IncrementalSolver(TSP(graph_data, names[0], centrality_df))
+
+
+def test_warm_start_reconnects_a_deleted_first_edge():
+    solver = make_solver(EDGES)
+    solver.best_solution = ['a', 'b', 'd', 'e', 'c']
+
+    solver.apply_delta(deleted=[{'start': 'a', 'end': 'b'}])
+
+    assert solver.get_warm_start() == ['a', 'c', 'b', 'd', 'e', 'c']
+
+
+def test_warm_start_drops_nodes_without_common_neighbor():
+    solver = make_solver([('a', 'b', 1), ('b', 'c', 1), ('c', 'd', 1), ('d', 'e', 1), ('a', 'e', 1)])
+    solver.best_solution = ['a', 'b', 'c', 'd', 'e']
+
+    solver.apply_delta(deleted=[{'start': 'b', 'end': 'c'}])
+
+    # c and d can't be reached from b through a common neighbor, e can through a
+    assert solver.get_warm_start() == ['a', 'b', 'a', 'e']
+
+
+def test_warm_start_reconnects_a_deleted_closing_edge():
+    solver = make_solver(EDGES)
+    solver.best_solution = ['a', 'b', 'd', 'e', 'c']
+
+    solver.apply_delta(deleted=[{'start': 'c', 'end': 'a'}])
+
+    assert solver.get_warm_start() == ['a', 'b', 'd', 'e', 'c', 'b']
+    assert solver.tsp.get_cost(solver.get_warm_start()) > 0
+
+
+def test_warm_start_drops_last_nodes_to_close_the_tour():
+    solver = make_solver([('a', 'b', 1), ('b', 'c', 1), ('c', 'd', 1), ('d', 'e', 1), ('a', 'e', 1)])
+    solver.best_solution = ['a', 'b', 'c', 'd', 'e']
+
+    solver.apply_delta(deleted=[{'start': 'e', 'end': 'a'}])
+
+    # Neither e nor d share a neighbor with a, c goes back through b
+    assert solver.get_warm_start() == ['a', 'b', 'c', 'b']
+    assert solver.tsp.get_cost(solver.get_warm_start()) > 0
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_warm_start_is_valid_after_random_deletions(seed):
+    rng = random.Random(seed)
+    names = [f'n{i}' for i in range(12)]
+    edges = [(a, b, rng.randint(1, 9)) for a in names for b in names if a < b and rng.random() < 0.5]
+    solver = make_solver(edges)
+    random.seed(seed)
+    solver.best_solution = solver.tsp.start()
+
+    cycle = solver.best_solution + solver.best_solution[:1]
+    tour_edges = {tuple(sorted(pair)) for pair in zip(cycle, cycle[1:])
+                  if solver.tsp.validate_state(pair)}
+    deleted = rng.sample(sorted(tour_edges), min(3, len(tour_edges)))
+    solver.apply_delta(deleted=[{'start': a, 'end': b} for a, b in deleted])
+    warm_start = solver.get_warm_start()
+
+    assert warm_start[0] == solver.best_solution[0]
+    assert solver.tsp.validate_state(warm_start)
+    if solver.tsp.graph.degree(solver.tsp.node_index[warm_start[0]]):  # Otherwise no tour can leave the start
+        assert len(warm_start) > 1
+        assert solver.tsp.get_cost(warm_start) > 0
@@ -0,0 +1,34 @@
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import IslandModel
+from Solve import degree_centrality
+from utils.CSRGraph import CSRGraph
+
+INSTANCE = Path(__file__).parent.parent / 'distance_matrix.csv'
+
+
+def test_islands_return_a_tour_and_release_the_graph(monkeypatch):
+    shared, original = [], IslandModel.share_graph
+
+    def share_graph(graph):
+        spec, blocks = original(graph)
+        shared.extend(block.name for block in blocks)
+        return spec, blocks
+
+    monkeypatch.setattr(IslandModel, 'share_graph', share_graph)
+    graph = CSRGraph.from_matrix(pd.read_csv(INSTANCE))
+    model = IslandModel.IslandModel(graph, 'l1', degree_centrality(graph))
+
+    tour, distance = model.solve(epochs=2, minimum_temperature=1, initial_temperature=100, cooling_factor=0.5, n=4,
+                                 islands=2, seed=0)
+
+    assert tour[0] == 'l1' and set(tour) == set(graph.names)
+    assert distance < float('inf')
+    assert len(shared) == 3
+    for name in shared:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
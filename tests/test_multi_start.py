@@ -0,0 +1,54 @@
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import MultiStart
+from Solve import degree_centrality
+from utils.CSRGraph import CSRGraph
+
+INSTANCE = Path(__file__).parent.parent / 'distance_matrix.csv'
+PARAMETERS = dict(x=2, minimum_temperature=1, initial_temperature=100, cooling_factor=0.5, n=4)
+SUB_INSTANCE = {'start_node': 'l2', 'nodes': ['l2', 'l3', 'l4', 'l5']}
+
+
+@pytest.fixture
+def multi_start():
+    graph = CSRGraph.from_matrix(pd.read_csv(INSTANCE))
+    return MultiStart.MultiStart(graph, degree_centrality(graph))
+
+
+def check_results(results):
+    assert [request for request, _ in results] == ['l1', 'l3', SUB_INSTANCE]
+    for request, (tour, distance) in results:
+        nodes = request['nodes'] if isinstance(request, dict) else ['l1', 'l2', 'l3', 'l4', 'l5']
+        assert tour[0] == (request['start_node'] if isinstance(request, dict) else request)
+        assert set(tour) <= set(nodes)
+        assert distance < float('inf')
+
+
+def test_in_process(multi_start):
+    results = list(multi_start.solve(['l1', 'l3', SUB_INSTANCE], **PARAMETERS))
+
+    check_results(results)
+
+
+def test_pool_releases_the_graph(multi_start, monkeypatch):
+    shared, original = [], MultiStart.share_graph
+
+    def share_graph(graph):
+        spec, blocks = original(graph)
+        shared.extend(block.name for block in blocks)
+        return spec, blocks
+
+    monkeypatch.setattr(MultiStart, 'share_graph', share_graph)
+    results = list(multi_start.solve(['l1', 'l3', SUB_INSTANCE], processes=2, **PARAMETERS))
+
+    # The pool yields the results as they finish
+    order = ['l1', 'l3', SUB_INSTANCE]
+    check_results(sorted(results, key=lambda result: order.index(result[0])))
+    assert len(shared) == 3
+    for name in shared:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
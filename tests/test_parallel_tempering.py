@@ -0,0 +1,59 @@
+import random
+
+import numpy as np
+import pandas as pd
+
+from ParallelTempering import ParallelTempering
+
+EDGES = [('a', 'b', 2), ('a', 'c', 4), ('b', 'c', 1), ('b', 'd', 5), ('c', 'd', 3), ('c', 'e', 6), ('d', 'e', 2),
+         ('a', 'e', 7)]
+
+
+def make_solver():
+    graph_data = [{'start': start, 'end': end, 'distance': distance} for start, end, distance in EDGES]
+    centrality_df = pd.DataFrame({'name': ['a', 'b', 'c', 'd', 'e'], 'pagerank': [0.5, 0.1, 0.9, 0.3, 0.2],
+                                  'degree': [3.0, 3.0, 4.0, 3.0, 3.0]})
+    return ParallelTempering(graph_data, 'a', centrality_df)
+
+
+def test_pool_and_in_process_runs_match():
+    in_process = make_solver().solve(rounds=4, steps=20, replicas=3, seed=7)
+    pool = make_solver().solve(rounds=4, steps=20, replicas=3, processes=2, seed=7)
+
+    assert in_process == pool
+    assert in_process[0][0] == 'a' and in_process[1] < float('inf')
+
+
+def test_solve_keeps_the_random_state_of_the_caller():
+    solver = make_solver()
+    random.seed(1)
+    np.random.seed(1)
+    expected = random.random(), np.random.random()
+
+    random.seed(1)
+    np.random.seed(1)
+    solver.solve(rounds=2, steps=10, replicas=2, seed=3)
+
+    assert (random.random(), np.random.random()) == expected
+
+
+def test_exchange_moves_better_states_to_colder_replicas():
+    temperatures = [1, 2, 4]
+    states, memories, costs = ['cold', 'middle', 'hot'], [{'c'}, {'m'}, {'h'}], [0.1, 0.5, 0.2]
+
+    # Even rounds exchange the pair (0, 1), odd rounds the pair (1, 2)
+    ParallelTempering.exchange(0, temperatures, states, memories, costs, random.Random(0))
+    assert states == ['middle', 'cold', 'hot'] and memories == [{'m'}, {'c'}, {'h'}] and costs == [0.5, 0.1, 0.2]
+
+    ParallelTempering.exchange(1, temperatures, states, memories, costs, random.Random(0))
+    assert states == ['middle', 'hot', 'cold'] and costs == [0.5, 0.2, 0.1]
+
+
+def test_exchange_rarely_moves_worse_states_to_colder_replicas():
+    temperatures = [0.001, 0.002]
+    states, memories, costs = ['good', 'bad'], [set(), set()], [0.5, 0.1]
+
+    ParallelTempering.exchange(0, temperatures, states, memories, costs, random.Random(0))
+
+    # delta is -200, the probability of the exchange is exp(-200)
+    assert states == ['good', 'bad']
@@ -0,0 +1,111 @@
+import asyncio
+import json
+from multiprocessing import shared_memory
+
+import pandas as pd
+import pytest
+
+import SolveService
+from utils.GraphSource import InMemoryGraphSource
+
+EDGES = [('a', 'b', 2), ('a', 'c', 4), ('b', 'c', 1), ('b', 'd', 5), ('c', 'd', 3), ('c', 'e', 6), ('d', 'e', 2),
+         ('a', 'e', 7)]
+PARAMETERS = {'x': 1, 'minimum_temperature': 1, 'initial_temperature': 10, 'cooling_factor': 0.5, 'n': 2}
+
+
+def make_source():
+    graph_data = [{'start': start, 'end': end, 'distance': distance} for start, end, distance in EDGES]
+    centrality_df = pd.DataFrame({'name': ['a', 'b', 'c', 'd', 'e'], 'degree': [3.0, 3.0, 4.0, 3.0, 3.0]})
+    # Two references to the same graph and one to a different graph
+    return InMemoryGraphSource({'first': (graph_data, centrality_df), 'same': (graph_data, centrality_df),
+                                'other': (graph_data[:-1], centrality_df)})
+
+
+class Reader:
+    def __init__(self, lines):
+        self.lines = [(line + '\n').encode() for line in lines]
+
+    async def readline(self):
+        await asyncio.sleep(0)
+        return self.lines.pop(0) if self.lines else b''
+
+
+class Writer:
+    def __init__(self):
+        self.responses = []
+
+    def write(self, data):
+        self.responses.append(json.loads(data))
+
+    async def drain(self):
+        pass
+
+
+@pytest.fixture
+def service():
+    service = SolveService.SolveService(make_source(), processes=1, cache_size=1, max_pending=2)
+    yield service
+    service.close()
+
+
+def is_released(prepared):
+    try:
+        shared_memory.SharedMemory(name=prepared.spec['indptr'][0]).close()
+    except FileNotFoundError:
+        return True
+    return False
+
+
+def test_serve_answers_every_request(service):
+    requests = [json.dumps({'id': 1, 'graph': 'first', 'start_node': 'a', 'parameters': PARAMETERS}),
+                json.dumps({'id': 2, 'graph': 'other', 'start_node': 'c', 'parameters': PARAMETERS}),
+                json.dumps({'id': 3, 'graph': 'missing', 'start_node': 'a'}),
+                json.dumps({'id': 4, 'graph': 'first', 'start_node': 'a', 'parameters': {'x': 0}}),
+                '',
+                'not json']
+    writer = Writer()
+
+    asyncio.run(service.serve(Reader(requests), writer))
+
+    responses = {response['id']: response for response in writer.responses}
+    assert len(writer.responses) == 5
+    assert responses[1]['tour'][0] == 'a' and responses[1]['distance'] > 0
+    assert responses[2]['tour'][0] == 'c' and responses[2]['distance'] > 0
+    assert responses[3]['error'].startswith('KeyError')
+    assert responses[4]['error'] == 'ValueError: x must be at least 1'
+    assert responses[None]['error'].startswith('JSONDecodeError')
+
+
+def test_get_graph_caches_by_content_and_releases_evicted_graphs(service):
+    async def run():
+        first = await service.get_graph('first')
+        assert await service.get_graph('same') is first
+        assert await service.get_graph('first', reload=True) is first
+
+        first.acquire()  # A request is still using the graph when it is evicted
+        other = await service.get_graph('other')
+        assert first.evicted and not is_released(first)
+        first.release()
+        assert is_released(first)
+        assert list(service._cache.values()) == [other]
+
+    asyncio.run(run())
+
+
+def test_serve_limits_the_pending_requests(service):
+    active, most_active = 0, 0
+
+    async def handle(line):
+        nonlocal active, most_active
+        active += 1
+        most_active = max(most_active, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return json.dumps({'id': json.loads(line)['id']})
+
+    service.handle = handle
+    writer = Writer()
+    asyncio.run(service.serve(Reader([json.dumps({'id': i}) for i in range(10)]), writer))
+
+    assert most_active == service.max_pending
+    assert sorted(response['id'] for response in writer.responses) == list(range(10))
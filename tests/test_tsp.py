@@ -0,0 +1,49 @@
+import random
+
+import numpy as np
+import pandas as pd
+
+from TSP import TSP
+
+EDGES = [('a', 'b', 2), ('a', 'c', 4), ('b', 'c', 1), ('b', 'd', 5), ('c', 'd', 3), ('c', 'e', 6), ('d', 'e', 2)]
+
+
+def make_tsp(memory_size=2):
+    graph_data = [{'start': start, 'end': end, 'distance': distance} for start, end, distance in EDGES]
+    names = ['a', 'b', 'c', 'd', 'e']
+    centrality_df = pd.DataFrame({'name': names, 'pagerank': [0.5, 0.1, 0.9, 0.3, 0.2],
+                                  'degree': [2.0, 3.0, 4.0, 3.0, 2.0], 'closeness': [0.2, 0.4, 0.1, 0.8, 0.3]})
+    return TSP(graph_data, 'a', centrality_df, memory_size=memory_size)
+
+
+def test_get_costs_matches_get_cost():
+    random.seed(0)
+    tsp = make_tsp()
+    states = [tsp.start() for _ in range(10)] + [['a', 'b', 'd', 'e', 'c'], ['a', 'b', 'e'], ['a']]
+
+    np.testing.assert_allclose(tsp.get_costs(states), [tsp.get_cost(state) for state in states])
+    assert list(tsp.are_solutions(states)) == [tsp.is_solution(state) for state in states]
+
+
+def test_future_states_are_unique_and_do_not_touch_memory():
+    np.random.seed(0)
+    tsp = make_tsp()
+    tsp.update_current_state(['a', 'b'])
+
+    candidates = tsp.get_random_future_states(20)
+
+    assert len(candidates) <= len(tsp.get_available_metrics())
+    assert len({tuple(candidate) for candidate in candidates}) == len(candidates)
+    assert all(candidate[:2] == ['a', 'b'] and len(candidate) == 3 for candidate in candidates)
+    assert tsp.memory == set()
+
+
+def test_select_future_state_records_only_the_selected_node():
+    np.random.seed(0)
+    tsp = make_tsp()
+    tsp.update_current_state(['a', 'b'])
+    selected = tsp.get_random_future_states(20)[-1]
+
+    tsp.select_future_state(selected)
+
+    assert tsp.memory == {selected[-1]}
@@ -0,0 +1,18 @@
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize('name', ['CSRGraph', 'GraphCreator', 'SessionManager'])
+def test_exports_resolve_to_the_class_after_importing_the_submodule(name):
+    if name != 'CSRGraph':
+        pytest.importorskip('neo4j')
+    # A new interpreter, so the submodule is imported before the name is read from the package
+    code = f'import utils.{name}\nfrom utils import {name}\nassert isinstance({name}, type), {name}'
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
+def test_exports_resolve_to_the_class_after_importing_a_sibling_module():
+    code = 'import TSP\nfrom utils import CSRGraph\nassert isinstance(CSRGraph, type), CSRGraph'
+    subprocess.run([sys.executable, '-c', code], check=True)
@@ -0,0 +1,278 @@
+import numpy as np
+
+
+class CSRGraph:
+    """
+    Undirected weighted graph stored in compressed sparse row (CSR) format.
+
+    The neighbors of the node i are indices[indptr[i]:indptr[i + 1]], sorted, and their distances are the same
+    slice of weights. Every edge is stored in both directions with an int32 index and a float32 weight, so the
+    graph takes 8 bytes per direction plus 8 bytes per node for indptr, instead of the list of dicts and the
+    distance dictionary.
+    """
+
+    def __init__(self, names, indptr, indices, weights):
+        """
+        :param names: list of node names, the position of a name is the index of the node
+        :param indptr: array of size len(names) + 1 with the offsets of each row
+        :param indices: array with the neighbors of every node, sorted inside each row
+        :param weights: array with the distance to each neighbor
+        """
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.weights = np.asarray(weights, dtype=np.float32)
+
+    @classmethod
+    def from_arrays(cls, names, sources, targets, distances):
+        """
+        Build the graph from parallel arrays of edges, each edge is added in both directions.
+        Repeated edges keep the first distance found.
+
+        :param names: list of node names
+        :param sources: index of the first node of each edge
+        :param targets: index of the second node of each edge
+        :param distances: distance of each edge
+        """
+        sources = np.asarray(sources, dtype=np.int32)
+        targets = np.asarray(targets, dtype=np.int32)
+        distances = np.asarray(distances, dtype=np.float32)
+
+        rows = np.concatenate((sources, targets))
+        cols = np.concatenate((targets, sources))
+        weights = np.concatenate((distances, distances))
+        del sources, targets, distances
+
+        order = np.lexsort((cols, rows))
+        rows, cols, weights = rows[order], cols[order], weights[order]
+        del order
+
+        # Drop repeated pairs
+        if len(rows) > 1:
+            keep = np.ones(len(rows), dtype=bool)
+            keep[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+            rows, cols, weights = rows[keep], cols[keep], weights[keep]
+
+        indptr = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(names)), out=indptr[1:])
+        return cls(names, indptr, cols, weights)
+
+    @classmethod
+    def from_edges(cls, graph_data):
+        """
+        Build the graph from the list of dicts returned by get_data.
+
+        :param graph_data: list of dicts with start, end and distance
+        """
+        index = {}
+        for conn in graph_data:
+            index.setdefault(conn['start'], len(index))
+            index.setdefault(conn['end'], len(index))
+
+        count = len(graph_data)
+        sources = np.fromiter((index[conn['start']] for conn in graph_data), dtype=np.int32, count=count)
+        targets = np.fromiter((index[conn['end']] for conn in graph_data), dtype=np.int32, count=count)
+        distances = np.fromiter((conn['distance'] for conn in graph_data), dtype=np.float32, count=count)
+        return cls.from_arrays(list(index), sources, targets, distances)
+
+    @classmethod
+    def from_matrix(cls, df):
+        """
+        Build the graph from a distance matrix with the layout of distance_matrix.csv, read with pd.read_csv:
+        the first column holds the names, -1 means that two nodes are not connected and the diagonal is ignored.
+
+        :param df: DataFrame with the distance matrix
+        """
+        names = list(df.columns[1:])
+        matrix = df.iloc[:, 1:].to_numpy(dtype=np.float32)
+        np.fill_diagonal(matrix, -1)
+        rows, cols = np.nonzero(matrix != -1)
+        return cls.from_arrays(names, rows, cols, matrix[rows, cols])
+
+    def subgraph(self, names):
+        """
+        Build the graph induced by a subset of nodes, keeping the order of names.
+
+        :param names: list of node names
+        :return: a new CSRGraph
+        """
+        keep = np.fromiter((self.index[name] for name in names), dtype=np.int64, count=len(names))
+        mapping = np.full(self.n_nodes, -1, dtype=np.int64)
+        mapping[keep] = np.arange(len(keep))
+
+        sources = mapping[np.repeat(np.arange(self.n_nodes), np.diff(self.indptr))]
+        targets = mapping[self.indices]
+        # Every edge is stored twice, keep one direction and let from_arrays add the other
+        mask = (sources >= 0) & (targets >= 0) & (sources < targets)
+        return CSRGraph.from_arrays(list(names), sources[mask], targets[mask], self.weights[mask])
+
+    def save(self, path):
+        """
+        Save the graph in a binary .npz file that can be read with load.
+        """
+        np.savez(path, names=np.array(self.names), indptr=self.indptr, indices=self.indices, weights=self.weights)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a graph saved with save.
+        """
+        with np.load(path) as data:
+            return cls(data['names'].tolist(), data['indptr'], data['indices'], data['weights'])
+
+    @property
+    def n_nodes(self):
+        return len(self.names)
+
+    @property
+    def n_edges(self):
+        """
+        :return: number of undirected edges
+        """
+        return len(self.indices) // 2
+
+    @property
+    def nbytes(self):
+        """
+        :return: bytes used by the arrays of the graph
+        """
+        return self.indptr.nbytes + self.indices.nbytes + self.weights.nbytes
+
+    def degree(self, node):
+        return int(self.indptr[node + 1] - self.indptr[node])
+
+    def neighbors(self, node):
+        """
+        :param node: index of a node
+        :return: a view with the indices of the neighbors of the node, no copy is made
+        """
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def neighbor_weights(self, node):
+        """
+        :param node: index of a node
+        :return: a view with the distances to the neighbors of the node, in the same order as neighbors
+        """
+        return self.weights[self.indptr[node]:self.indptr[node + 1]]
+
+    def weight(self, source, target):
+        """
+        :return: the distance between two node indices, inf if they are not connected
+        """
+        neighbors = self.neighbors(source)
+        position = np.searchsorted(neighbors, target)
+        if position < len(neighbors) and neighbors[position] == target:
+            return float(self.weights[self.indptr[source] + position])
+        return float('inf')
+
+    def edge_weights(self, sources, targets):
+        """
+        Vectorized version of weight.
+
+        :param sources: array of node indices
+        :param targets: array of node indices
+        :return: an array with the distance of each pair, inf when the nodes are not connected
+        """
+        position, found = self.search(sources, targets)
+        if len(self.indices) == 0:
+            return np.full(len(position), np.inf)
+        return np.where(found, self.weights.take(position, mode='clip').astype(np.float64), np.inf)
+
+    def search(self, sources, targets):
+        """
+        Find the position of many pairs of nodes in indices, running a binary search on every row at the same time.
+
+        :param sources: array of node indices
+        :param targets: array of node indices
+        :return: the position of each pair, or the position where it should be inserted, and whether it was found
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        low = self.indptr[sources]
+        end = self.indptr[sources + 1]
+        if len(self.indices) == 0 or len(sources) == 0:
+            return low, np.zeros(len(sources), dtype=bool)
+
+        # Branchless lower bound, the same steps for every row: move to probe while the element before it is lower
+        # than the target. Probes are clipped to the end of the row, and an empty row never moves.
+        step = 1 << int((end - low).max()).bit_length()
+        while step:
+            probe = np.minimum(low + step, end)
+            low = np.where(self.indices.take(probe - 1, mode='clip') < targets, probe, low)
+            step >>= 1
+
+        found = (low < end) & (self.indices.take(low, mode='clip') == targets)
+        return low, found
+
+    def _edge_arrays(self, edges, with_distance=False):
+        """
+        Turn a list of dicts with start and end (and distance) into arrays with both directions of each edge.
+        The edges are undirected, so a-b and b-a are the same edge and only the last one is kept.
+        """
+        count = len(edges)
+        sources = np.fromiter((self.index[conn['start']] for conn in edges), dtype=np.int64, count=count)
+        targets = np.fromiter((self.index[conn['end']] for conn in edges), dtype=np.int64, count=count)
+        if (sources == targets).any():
+            raise ValueError('Self loops are not supported')
+
+        first, second = np.minimum(sources, targets), np.maximum(sources, targets)
+        _, last = np.unique((first * self.n_nodes + second)[::-1], return_index=True)
+        keep = np.sort(count - 1 - last)
+        first, second = first[keep], second[keep]
+
+        rows, cols = np.concatenate((first, second)), np.concatenate((second, first))
+        if not with_distance:
+            return rows, cols
+        distances = np.fromiter((conn['distance'] for conn in edges), dtype=np.float32, count=count)[keep]
+        return rows, cols, np.concatenate((distances, distances))
+
+    def apply_delta(self, inserted=(), deleted=(), changed=()):
+        """
+        Update the graph in place. Weight changes are written on the arrays, insertions and deletions rebuild them
+        with vectorized operations, which is much cheaper than building the graph again.
+        Nodes of inserted edges that are not in the graph are added at the end.
+
+        :param inserted: list of dicts with start, end and distance of new edges
+        :param deleted: list of dicts with start and end of the edges to remove
+        :param changed: list of dicts with start, end and the new distance of existing edges
+        :return: the names of the nodes whose neighbors changed
+        """
+        for conn in inserted:
+            for name in (conn['start'], conn['end']):
+                if name not in self.index:
+                    self.index[name] = len(self.names)
+                    self.names.append(name)
+                    self.indptr = np.append(self.indptr, self.indptr[-1])
+
+        if changed:
+            rows, cols, distances = self._edge_arrays(changed, with_distance=True)
+            position, found = self.search(rows, cols)
+            if not found.all():
+                raise ValueError('Only existing edges can be changed')
+            self.weights[position] = distances
+
+        affected = set()
+        if deleted:
+            rows, cols = self._edge_arrays(deleted)
+            position, found = self.search(rows, cols)
+            if not found.all():
+                raise ValueError('Only existing edges can be deleted')
+            self.indices = np.delete(self.indices, position)
+            self.weights = np.delete(self.weights, position)
+            self.indptr[1:] -= np.cumsum(np.bincount(rows, minlength=self.n_nodes))
+            affected.update(rows.tolist())
+
+        if inserted:
+            rows, cols, distances = self._edge_arrays(inserted, with_distance=True)
+            order = np.lexsort((cols, rows))
+            rows, cols, distances = rows[order], cols[order], distances[order]
+            position, found = self.search(rows, cols)
+            if found.any():
+                raise ValueError('Inserted edges must not be in the graph, change them instead')
+            self.indices = np.insert(self.indices, position, cols.astype(np.int32))
+            self.weights = np.insert(self.weights, position, distances)
+            self.indptr[1:] += np.cumsum(np.bincount(rows, minlength=self.n_nodes))
+            affected.update(rows.tolist())
+
+        return [self.names[node] for node in sorted(affected)]
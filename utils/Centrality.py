@@ -1,20 +1,27 @@
 from constants import constants
-from utils import SessionManager
+from utils.GraphCreator import GraphCreator
+from utils.SessionManager import SessionManager
 import pandas as pd
 
+CENTRALITY_MEASURES = tuple(constants.centrality_columns)
 
-def get_centrality_data():
-    driver = SessionManager()
-    queries = constants.queries_dict
 
-    pagerank = driver.bring_data(queries['page_rank'])
-    degree = driver.bring_data(queries['degree'])
-    closeness = driver.bring_data(queries['closeness'])
-    clustering = driver.bring_data(queries['clustering'])
-    data = pd.merge(pagerank, degree, on='name')
-    data = pd.merge(data, closeness, on='name')
-    data = pd.merge(data, clustering, on='name')
-    return data
+def get_centrality_data(measures=CENTRALITY_MEASURES):
+    """
+    Compute the centralities that are not up to date in write mode, reusing the projection when the graph did not
+    change, and read all of them back with a single query.
+    :param measures: the names of the centrality measures, by default all of them
+    :return: a dataframe with the name of each node and one column per measure
+    """
+    graph_creator = GraphCreator()
+    try:
+        graph_creator.write_centralities(measures)
+    finally:
+        graph_creator.close()
+
+    driver = SessionManager()
+    columns = driver.execute(constants.read_centralities_query(measures))[0]
+    return pd.DataFrame(columns)
 
 
 def get_data():
@@ -3,6 +3,8 @@ import configparser
 from neo4j import GraphDatabase
 from neo4j.exceptions import Neo4jError
 
+from constants import constants
+
 
 class GraphCreator:
 
@@ -34,11 +36,63 @@ class GraphCreator:
                     # Skip diagonal and -1 values
                     if i != j and value != -1:
                         session.execute_write(self._create_relationship, row[0], df.columns[j + 1], value)
-
-    def create_virtual_graph(self):
+            self._bump_version(session)
+
+    def apply_delta(self, inserted=(), deleted=(), changed=()):
+        """
+        Apply a delta of edges to the database without rebuilding the graph. Edges are stored in both directions,
+        as in create_graph. Only inserting or deleting edges changes the version of the graph, so the virtual graph
+        and the centralities are computed again on the next use, the projection does not use the distances.
+
+        :param inserted: list of dicts with start, end and distance of new edges
+        :param deleted: list of dicts with start and end of the edges to remove
+        :param changed: list of dicts with start, end and the new distance of existing edges
+        """
+        with self._driver.session() as session:
+            if inserted:
+                session.execute_write(self._insert_relationships, list(inserted))
+            if deleted:
+                session.execute_write(self._delete_relationships, list(deleted))
+            if changed:
+                session.execute_write(self._update_relationships, list(changed))
+            if inserted or deleted:
+                self._bump_version(session)
+
+    def create_virtual_graph(self, force=False):
+        """
+        Project the virtual graph, unless the existing projection was made from the current version of the graph.
+
+        :param force: project again even if the projection is valid
+        :return: the version of the graph
+        """
         with self._driver.session() as session:
-            self._drop_virtual(session)
-            self._create_virtual(session)
+            meta, projected = self._get_meta(session)
+            version = meta.get('version', 0)
+            if force or not projected or meta.get('projected_version') != version:
+                if projected:
+                    self._drop_virtual(session)
+                self._create_virtual(session)
+                self._set_meta(session, {'version': version, 'projected_version': version})
+        return version
+
+    def write_centralities(self, measures):
+        """
+        Compute the centrality measures on the virtual graph in write mode, so they are stored on the nodes.
+        Measures already written for the current version of the graph are not computed again.
+
+        :param measures: names of the measures, keys of constants.centrality_columns
+        """
+        version = self.create_virtual_graph()
+        with self._driver.session() as session:
+            meta, _ = self._get_meta(session)
+            stale = [measure for measure in measures
+                     if meta.get(f'{constants.centrality_columns[measure]}_version') != version]
+            for measure in stale:
+                query = constants.queries_dict[f'write_{measure}']
+                session.execute_write(lambda tx: tx.run(query).consume())
+            if stale:
+                self._set_meta(session, {f'{constants.centrality_columns[measure]}_version': version
+                                         for measure in stale})
 
     @staticmethod
     def _create_node(tx, location):
@@ -58,6 +112,49 @@ class GraphCreator:
         )
         tx.run(query, from_location=from_location, to_location=to_location, distance=distance)
 
+    @staticmethod
+    def _insert_relationships(tx, edges):
+        query = (
+            "UNWIND $edges AS edge "
+            "MERGE (l1:Location {name: edge.start}) "
+            "MERGE (l2:Location {name: edge.end}) "
+            "MERGE (l1)-[r1:CONNECTS_TO]->(l2) "
+            "MERGE (l2)-[r2:CONNECTS_TO]->(l1) "
+            "SET r1.distance = edge.distance, r2.distance = edge.distance"
+        )
+        tx.run(query, edges=edges)
+
+    @staticmethod
+    def _delete_relationships(tx, edges):
+        query = (
+            "UNWIND $edges AS edge "
+            "MATCH (:Location {name: edge.start})-[r:CONNECTS_TO]-(:Location {name: edge.end}) "
+            "DELETE r"
+        )
+        tx.run(query, edges=edges)
+
+    @staticmethod
+    def _update_relationships(tx, edges):
+        query = (
+            "UNWIND $edges AS edge "
+            "MATCH (:Location {name: edge.start})-[r:CONNECTS_TO]-(:Location {name: edge.end}) "
+            "SET r.distance = edge.distance"
+        )
+        tx.run(query, edges=edges)
+
+    @staticmethod
+    def _get_meta(session):
+        record = session.execute_read(lambda tx: tx.run(constants.queries_dict['graph_meta']).single())
+        return record['meta'] or {}, record['projected']
+
+    @staticmethod
+    def _set_meta(session, properties):
+        session.execute_write(lambda tx: tx.run(constants.queries_dict['set_meta'], properties=properties).consume())
+
+    @staticmethod
+    def _bump_version(session):
+        session.execute_write(lambda tx: tx.run(constants.queries_dict['bump_version']).consume())
+
     @staticmethod
     def _drop_existing(session):
         try:
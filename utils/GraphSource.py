@@ -0,0 +1,60 @@
+import hashlib
+
+import pandas as pd
+
+from utils.CSRGraph import CSRGraph
+
+
+def graph_hash(graph: CSRGraph, centrality_df: pd.DataFrame):
+    """
+    Hash the content of a graph and its centrality data, two references to the same graph get the same hash.
+
+    :return: a hex digest
+    """
+    digest = hashlib.sha1()
+    digest.update('\0'.join(map(str, graph.names)).encode())
+    for array in (graph.indptr, graph.indices, graph.weights):
+        digest.update(array.tobytes())
+    digest.update(pd.util.hash_pandas_object(centrality_df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class InMemoryGraphSource:
+    """
+    Graph source backed by a dictionary, used to run the service without a database.
+    """
+
+    def __init__(self, graphs=None):
+        """
+        :param graphs: dictionary from a graph reference to a tuple (graph_data, centrality_df), graph_data can be
+        the list of dicts returned by get_data or a CSRGraph
+        """
+        self.graphs = dict(graphs or {})
+
+    def add(self, reference, graph_data, centrality_df):
+        self.graphs[reference] = (graph_data, centrality_df)
+
+    def load(self, reference):
+        """
+        :return: (CSRGraph, centrality_df) of the reference
+        """
+        if reference not in self.graphs:
+            raise KeyError(f'Unknown graph: {reference}')
+        graph_data, centrality_df = self.graphs[reference]
+        graph = graph_data if isinstance(graph_data, CSRGraph) else CSRGraph.from_edges(graph_data)
+        return graph, centrality_df
+
+
+class Neo4jGraphSource:
+    """
+    Graph source that reads the graph and the centralities from the Neo4j database configured in config.ini.
+    There is only one graph in the database, so the reference is ignored.
+    """
+
+    def load(self, reference):
+        """
+        :return: (CSRGraph, centrality_df) of the database
+        """
+        from utils.Centrality import get_centrality_data, get_data
+
+        return CSRGraph.from_edges(get_data()), get_centrality_data()
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from utils.CSRGraph import CSRGraph
+
+# GraphCreator stores every edge in both directions and the GDS projection is undirected, so the degree computed by
+# GDS counts each neighbor twice
+RELATIONSHIPS_PER_EDGE = 2
+
+
+def local_degree(graph: CSRGraph, nodes):
+    """
+    :param nodes: list of node indices
+    :return: the degree of each node, on the same scale as the degree of get_centrality_data
+    """
+    nodes = np.asarray(nodes, dtype=np.int64)
+    return (graph.indptr[nodes + 1] - graph.indptr[nodes]) * float(RELATIONSHIPS_PER_EDGE)
+
+
+def local_clustering(graph: CSRGraph, nodes):
+    """
+    :param nodes: list of node indices
+    :return: the local clustering coefficient of each node, the fraction of pairs of neighbors that are connected
+    """
+    coefficients = []
+    for node in nodes:
+        neighbors = graph.neighbors(node)
+        neighbors = neighbors[neighbors != node]
+        k = len(neighbors)
+        if k < 2:
+            coefficients.append(0.0)
+            continue
+        links = sum(np.count_nonzero(np.isin(graph.neighbors(neighbor), neighbors)) for neighbor in neighbors)
+        coefficients.append(links / (k * (k - 1)))  # Every link between neighbors is counted twice
+    return np.array(coefficients)
+
+
+def affected_by_topology(graph: CSRGraph, names):
+    """
+    The clustering coefficient of a node changes when an edge between two of its neighbors is added or removed, so
+    the nodes whose values change are the endpoints of the changed edges and their neighbors.
+
+    :param names: the names of the endpoints of the inserted and deleted edges
+    :return: list of node indices
+    """
+    nodes = {graph.index[name] for name in names}
+    for node in list(nodes):
+        nodes.update(graph.neighbors(node).tolist())
+    return sorted(nodes)
+
+
+def update_local_centralities(centrality_df: pd.DataFrame, graph: CSRGraph, names):
+    """
+    Recompute the local centrality measures (degree and clustering) only for the nodes affected by inserting or
+    deleting edges. The global measures (pagerank and closeness) are left as they are.
+
+    :param centrality_df: a dataframe containing the nodes and some centrality measures
+    :param names: the names of the endpoints of the inserted and deleted edges
+    :return: a new centrality dataframe, with a row for the nodes that were not in it
+    """
+    nodes = affected_by_topology(graph, names)
+    values = pd.DataFrame({'name': [graph.names[node] for node in nodes]})
+    if 'degree' in centrality_df.columns:
+        values['degree'] = local_degree(graph, nodes)
+    if 'clustering' in centrality_df.columns:
+        values['clustering'] = local_clustering(graph, nodes)
+    return merge_centralities(centrality_df, values)
+
+
+def merge_centralities(centrality_df: pd.DataFrame, values: pd.DataFrame):
+    """
+    Replace the values of some nodes and measures of a centrality dataframe.
+
+    :param values: dataframe with a name column and the measures to replace
+    :return: a new centrality dataframe
+    """
+    merged = centrality_df.set_index('name')
+    values = values.set_index('name')
+    merged = merged.reindex(merged.index.union(values.index, sort=False))
+    merged.update(values)
+    return merged.rename_axis('name').reset_index()
@@ -0,0 +1,56 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from utils.CSRGraph import CSRGraph
+
+_ARRAYS = ('indptr', 'indices', 'weights')
+
+
+def share_graph(graph: CSRGraph):
+    """
+    Copy the arrays of a CSRGraph into shared memory blocks, so worker processes can use the graph without a copy
+    per process. The caller owns the blocks and must call release_graph when the workers are done.
+
+    :param graph: the graph to share
+    :return: a picklable spec to pass to attach_graph, and the list of shared memory blocks
+    """
+    spec = {'names': graph.names}
+    blocks = []
+    for attribute in _ARRAYS:
+        array = getattr(graph, attribute)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+        spec[attribute] = (block.name, array.dtype.str, array.shape)
+        blocks.append(block)
+    return spec, blocks
+
+
+def attach_graph(spec):
+    """
+    Build a read-only CSRGraph over the shared memory blocks described by spec.
+    The blocks must be kept alive as long as the graph is used.
+
+    :param spec: the spec returned by share_graph
+    :return: the graph and the list of attached blocks
+    """
+    arrays = {}
+    blocks = []
+    for attribute in _ARRAYS:
+        name, dtype, shape = spec[attribute]
+        block = shared_memory.SharedMemory(name=name)
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        array.flags.writeable = False
+        arrays[attribute] = array
+        blocks.append(block)
+    return CSRGraph(spec['names'], **arrays), blocks
+
+
+def release_graph(blocks, unlink=True):
+    """
+    Close the shared memory blocks, and free them when unlink is True (only the owner should do it).
+    """
+    for block in blocks:
+        block.close()
+        if unlink:
+            block.unlink()
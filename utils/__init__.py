@@ -1,4 +1,38 @@
-from .SessionManager import SessionManager
-from .Centrality import get_centrality_data, get_data
-from .GenerateData import generate_data
-from .GraphCreator import GraphCreator
\ No newline at end of file
+import importlib
+import sys
+import types
+
+# The modules are imported on first use, so solving from a local graph does not load the neo4j driver
+_exports = {
+    'SessionManager': '.SessionManager',
+    'get_centrality_data': '.Centrality',
+    'get_data': '.Centrality',
+    'CSRGraph': '.CSRGraph',
+    'generate_data': '.GenerateData',
+    'GraphCreator': '.GraphCreator',
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    if name not in _exports:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(_exports[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+class _LazyModule(types.ModuleType):
+    """
+    Importing a submodule binds it on the package under its name, which would hide the class with the same name.
+    Those bindings are ignored, so the exported names always resolve to the class whatever the import order.
+    """
+
+    def __setattr__(self, name, value):
+        if name in _exports and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _LazyModule